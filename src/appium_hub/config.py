@@ -3,11 +3,12 @@ Configuration module for Appium Hub
 """
 
 import os
+from dataclasses import dataclass, asdict
 from typing import Dict, Any
-from pydantic import BaseModel
 
 
-class HubConfig(BaseModel):
+@dataclass(slots=True, frozen=True)
+class HubConfig:
     """Configuration for the Appium Hub"""
 
     # Server settings
@@ -44,7 +45,7 @@ class HubConfig(BaseModel):
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return self.model_dump()
+        return asdict(self)
 
 
 # Default configuration
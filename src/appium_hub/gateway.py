@@ -3,16 +3,37 @@ HTTP Gateway Server - FastAPI server that proxies requests to Appium servers
 """
 
 import json
-import httpx
+import socket
+import asyncio
+import orjson
+import msgspec
+import aiohttp
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional
-from fastapi import FastAPI, Request, Response, HTTPException
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
 from .session_pool import SessionPool
 
+# Hop-by-hop headers, which only apply to a single connection
+_HOP_BY_HOP = frozenset(
+    b"connection upgrade keep-alive proxy-authenticate proxy-authorization "
+    b"te trailers transfer-encoding".split()
+)
+# Request headers that must not be forwarded to the Appium server
+_EXCLUDED_REQUEST_HEADERS = _HOP_BY_HOP | {b"host", b"content-length"}
 
-class CreateSessionRequest(BaseModel):
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+class CreateSessionRequest(msgspec.Struct):
     """Request model for creating a new session"""
 
     capabilities: Dict[str, Any]
@@ -20,15 +41,133 @@ class CreateSessionRequest(BaseModel):
     device_name: Optional[str] = None
 
 
+class _AppiumProxy:
+    """Bare ASGI endpoint that forwards WebDriver commands to a session's server
+
+    Used instead of a FastAPI route so the per-command hot path skips request
+    parsing and dependency resolution; it only moves bytes.
+    """
+
+    def __init__(self, gateway: "AppiumGateway"):
+        self.gateway = gateway
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gateway = self.gateway
+        params = scope["path_params"]
+        # Proxied commands are the session's activity, so this lookup keeps it alive
+        session = gateway.session_pool.get_session(params["session_id"])
+        if not session:
+            await ORJSONResponse({"detail": "Session not found"}, 404)(
+                scope, receive, send
+            )
+            return
+
+        target_url = f"{session.service_url}/session/{params['path']}"
+
+        # Get request body
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        # Prepare headers (exclude hop-by-hop headers); ASGI servers already
+        # deliver raw header names lowercased. A client usually sends identical
+        # headers on every command of a session, so reuse the previous result
+        # when they match.
+        raw_headers = scope["headers"]
+        cached = session.header_cache
+        if cached is not None and cached[0] == raw_headers:
+            headers = cached[1]
+        else:
+            headers = [
+                (k.decode("latin-1"), v.decode("latin-1"))
+                for k, v in raw_headers
+                if k not in _EXCLUDED_REQUEST_HEADERS
+            ]
+            session.header_cache = (raw_headers, headers)
+
+        try:
+            response = await gateway.http.request(
+                scope["method"], target_url, headers=headers, data=body or None
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            gateway.logger.error(f"Request error proxying to Appium: {str(e)}")
+            await ORJSONResponse({"detail": "Service unavailable"}, 503)(
+                scope, receive, send
+            )
+            return
+        except Exception as e:
+            gateway.logger.error(f"Error proxying request: {str(e)}")
+            await ORJSONResponse({"detail": "Internal server error"}, 500)(
+                scope, receive, send
+            )
+            return
+
+        # Stream the response from Appium server as it arrives, so large
+        # screenshots or page sources are never buffered whole. Headers go back
+        # as the raw byte pairs aiohttp read, minus the per-connection ones.
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status,
+                    "headers": [
+                        (k, v)
+                        for k, v in response.raw_headers
+                        if k.lower() not in _HOP_BY_HOP
+                    ],
+                }
+            )
+            async for chunk in response.content.iter_chunked(65536):
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            response.release()
+
+
 class AppiumGateway:
     """FastAPI application that acts as a gateway to Appium servers"""
 
     def __init__(self, session_pool: SessionPool):
         self.session_pool = session_pool
-        self.app = FastAPI(title="Appium Gateway Hub", version="1.0.0")
+        self.http: aiohttp.ClientSession = None
+        self.app = FastAPI(
+            title="Appium Gateway Hub",
+            version="1.0.0",
+            lifespan=self._lifespan,
+            default_response_class=ORJSONResponse,
+        )
         self.logger = logging.getLogger(__name__)
         self._setup_routes()
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Own a single HTTP client so connections to Appium servers are reused"""
+        self.http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                # Every session is its own host, so size the pool to the hub
+                limit=max(1000, 20 * self.session_pool.max_sessions),
+                limit_per_host=100,
+                keepalive_timeout=75,
+                # Appium servers only listen on 127.0.0.1; aiohttp connects to IP
+                # literals without consulting a resolver
+                family=socket.AF_INET,
+            ),
+            timeout=aiohttp.ClientTimeout(total=60),
+            # Forward response bodies exactly as Appium encoded them
+            auto_decompress=False,
+        )
+        try:
+            yield
+        finally:
+            await self.http.close()
+
     def _setup_routes(self):
         """Setup FastAPI routes"""
 
@@ -45,21 +184,31 @@ class AppiumGateway:
         @self.app.get("/health")
         async def health_check():
             """Health check endpoint"""
-            health = self.session_pool.health_check()
-            return JSONResponse(content=health)
+            health = await run_in_threadpool(self.session_pool.health_check)
+            return ORJSONResponse(content=health)
 
         @self.app.get("/sessions")
         async def list_sessions():
             """List all active sessions"""
-            sessions = self.session_pool.list_sessions()
-            return JSONResponse(content={"sessions": sessions})
+            sessions = await run_in_threadpool(self.session_pool.list_sessions)
+            return ORJSONResponse(content={"sessions": sessions})
 
         @self.app.post("/session")
-        async def create_session(request: CreateSessionRequest):
+        async def create_session(http_request: Request):
             """Create a new Appium session"""
             try:
-                session_id = self.session_pool.create_session(
-                    device_udid=request.device_udid, device_name=request.device_name
+                request = msgspec.json.decode(
+                    await http_request.body(), type=CreateSessionRequest
+                )
+            except msgspec.DecodeError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+            try:
+                # Starting an Appium server blocks for seconds; keep it off the loop
+                session_id = await run_in_threadpool(
+                    self.session_pool.create_session,
+                    device_udid=request.device_udid,
+                    device_name=request.device_name,
                 )
 
                 if not session_id:
@@ -68,26 +217,25 @@ class AppiumGateway:
                     )
 
                 # Get session URL
-                session_url = self.session_pool.get_session_url(session_id)
+                session_url = self.session_pool.peek_session_url(session_id)
 
                 # Forward the session creation request to the actual Appium server
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{session_url}/session",
-                        json={"capabilities": request.capabilities},
-                        timeout=60.0,
-                    )
-
-                if response.status_code != 200:
-                    # Clean up the session if Appium server creation failed
-                    self.session_pool.delete_session(session_id)
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Failed to create Appium session: {response.text}",
-                    )
-
-                # Parse the response to get the actual session ID from Appium
-                appium_response = response.json()
+                async with self.http.post(
+                    f"{session_url}/session",
+                    json={"capabilities": request.capabilities},
+                ) as response:
+                    if response.status != 200:
+                        # Clean up the session if Appium server creation failed
+                        await run_in_threadpool(
+                            self.session_pool.delete_session, session_id
+                        )
+                        raise HTTPException(
+                            status_code=response.status,
+                            detail=f"Failed to create Appium session: {await response.text()}",
+                        )
+
+                    # Parse the response to get the actual session ID from Appium
+                    appium_response = orjson.loads(await response.read())
 
                 return {
                     "hub_session_id": session_id,
@@ -95,107 +243,71 @@ class AppiumGateway:
                     "service_url": session_url,
                 }
 
-            except httpx.RequestError as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 self.logger.error(f"Request error creating session: {str(e)}")
                 if "session_id" in locals():
-                    self.session_pool.delete_session(session_id)
+                    await run_in_threadpool(
+                        self.session_pool.delete_session, session_id
+                    )
                 raise HTTPException(status_code=503, detail="Service unavailable")
             except Exception as e:
                 self.logger.error(f"Error creating session: {str(e)}")
                 if "session_id" in locals():
-                    self.session_pool.delete_session(session_id)
+                    await run_in_threadpool(
+                        self.session_pool.delete_session, session_id
+                    )
                 raise HTTPException(status_code=500, detail="Internal server error")
 
         @self.app.delete("/session/{session_id}")
         async def delete_session(session_id: str):
             """Delete an Appium session"""
-            session = self.session_pool.get_session(session_id)
+            session = self.session_pool.peek_session(session_id)
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
 
             # Try to delete session from Appium server first
             try:
-                session_url = session.server_manager.get_service_url()
-                async with httpx.AsyncClient() as client:
-                    # This will fail if there's no active Appium session, but that's OK
-                    await client.delete(f"{session_url}/session", timeout=30.0)
+                session_url = session.service_url
+                # This will fail if there's no active Appium session, but that's OK
+                async with self.http.delete(
+                    f"{session_url}/session", timeout=aiohttp.ClientTimeout(total=30)
+                ):
+                    pass
             except Exception as e:
                 self.logger.warning(f"Could not delete Appium session: {str(e)}")
 
             # Delete the session from our pool
-            if self.session_pool.delete_session(session_id):
+            if await run_in_threadpool(self.session_pool.delete_session, session_id):
                 return {"message": "Session deleted successfully"}
             else:
                 raise HTTPException(status_code=500, detail="Failed to delete session")
 
-        @self.app.api_route(
-            "/session/{session_id}/{path:path}",
-            methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
-        )
-        async def proxy_to_appium(session_id: str, path: str, request: Request):
-            """Proxy requests to the appropriate Appium server"""
-            session = self.session_pool.get_session(session_id)
-            if not session:
-                raise HTTPException(status_code=404, detail="Session not found")
-
-            session_url = session.server_manager.get_service_url()
-            target_url = f"{session_url}/session/{path}"
-
-            try:
-                # Get request body
-                body = await request.body()
-
-                # Prepare headers (exclude hop-by-hop headers)
-                headers = dict(request.headers)
-                excluded_headers = ["host", "content-length", "connection", "upgrade"]
-                headers = {
-                    k: v
-                    for k, v in headers.items()
-                    if k.lower() not in excluded_headers
-                }
-
-                async with httpx.AsyncClient() as client:
-                    response = await client.request(
-                        method=request.method,
-                        url=target_url,
-                        headers=headers,
-                        content=body,
-                        timeout=60.0,
-                    )
-
-                # Return the response from Appium server
-                return Response(
-                    content=response.content,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                )
-
-            except httpx.RequestError as e:
-                self.logger.error(f"Request error proxying to Appium: {str(e)}")
-                raise HTTPException(status_code=503, detail="Service unavailable")
-            except Exception as e:
-                self.logger.error(f"Error proxying request: {str(e)}")
-                raise HTTPException(status_code=500, detail="Internal server error")
-
         @self.app.get("/session/{session_id}/info")
         async def get_session_info(session_id: str):
             """Get information about a specific session"""
-            session = self.session_pool.get_session(session_id)
+            session = self.session_pool.peek_session(session_id)
             if not session:
                 raise HTTPException(status_code=404, detail="Session not found")
 
             return {
                 "session_id": session_id,
                 "port": session.server_manager.port,
-                "service_url": session.server_manager.get_service_url(),
-                "created_at": session.created_at,
-                "last_used": session.last_used,
+                "service_url": session.service_url,
+                "created_at": session.created_at_wall,
+                "last_used": session.last_used_wall,
                 "device_udid": session.device_udid,
                 "device_name": session.device_name,
-                "is_alive": session.server_manager.is_alive(),
+                "is_alive": await run_in_threadpool(session.server_manager.is_alive),
                 "log_file": session.server_manager.log_file,
             }
 
+        # Registered last so the session routes above take precedence
+        self.app.add_route(
+            "/session/{session_id}/{path:path}",
+            _AppiumProxy(self),
+            methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
+        )
+
     def get_app(self) -> FastAPI:
         """Get the FastAPI application instance"""
         return self.app
@@ -65,6 +65,8 @@ class AppiumHub:
                 logging.FileHandler("appium_hub.log"),
             ],
         )
+        # httpx logs every status probe at INFO
+        logging.getLogger("httpx").setLevel(logging.WARNING)
 
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
@@ -89,6 +91,9 @@ class AppiumHub:
                 port=self.port,
                 log_level=self.log_level.lower(),
                 access_log=True,
+                loop="uvloop",
+                http="httptools",
+                ws="none",
             )
         except Exception as e:
             self.logger.error(f"Error running server: {str(e)}")
@@ -105,6 +110,9 @@ class AppiumHub:
             port=self.port,
             log_level=self.log_level.lower(),
             access_log=True,
+            loop="uvloop",
+            http="httptools",
+            ws="none",
         )
         server = uvicorn.Server(config)
 
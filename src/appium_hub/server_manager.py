@@ -4,22 +4,86 @@ Appium Server Manager - Manages individual Appium server instances
 
 import os
 import time
+import queue
+import atexit
 import logging
+import logging.handlers
 import threading
 import subprocess
 import signal
-import requests
-from typing import Optional, Dict, Any
+import httpx
+from typing import Optional, Dict, Any, Tuple
+
+# Shared by all managers for status probes; keeps connections to each server alive.
+# Created on first use so importing the package opens no client.
+_status_client: Optional[httpx.Client] = None
+_status_client_lock = threading.Lock()
+
+
+def _get_status_client() -> httpx.Client:
+    """Return the shared status client, creating it on first use"""
+    global _status_client
+    with _status_client_lock:
+        if _status_client is None:
+            _status_client = httpx.Client(timeout=2.0)
+        return _status_client
+
+
+class _SessionLogRouter(logging.Handler):
+    """Writes queued records to the log file of the server that emitted them"""
+
+    def __init__(self):
+        super().__init__()
+        self._handlers: Dict[str, logging.Handler] = {}
+
+    def register(self, name: str, handler: logging.Handler) -> None:
+        self._handlers[name] = handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Closing goes through the queue so records logged before it still land
+        if getattr(record, "close_log", False):
+            handler = self._handlers.pop(record.name, None)
+            if handler:
+                handler.close()
+            return
+
+        handler = self._handlers.get(record.name)
+        if handler:
+            handler.handle(record)
+
+
+# Server loggers only enqueue records; one background thread does the file I/O
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_router = _SessionLogRouter()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_listener_lock = threading.Lock()
+
+
+def _start_log_listener() -> None:
+    """Start the log writer thread the first time a server logger is set up"""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is None:
+            _log_listener = logging.handlers.QueueListener(_log_queue, _log_router)
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
 
 
 class AppiumServerManager:
     """Manages a single Appium server instance with unique port and log file"""
 
+    # How long (seconds) an is_alive() probe result is reused
+    ALIVE_CACHE_TTL = 1.0
+
     def __init__(self, port: int, session_id: str, log_dir: str = "logs"):
         self.port = port
         self.session_id = session_id
         self.log_dir = log_dir
         self.process: Optional[subprocess.Popen] = None
+        self.service_url = f"http://127.0.0.1:{port}"
+        self.status_url = f"{self.service_url}/status"
+        self._alive_cache: Optional[Tuple[float, bool]] = None
         self._lock = threading.Lock()
         self.is_running = False
 
@@ -40,8 +104,8 @@ class AppiumServerManager:
         # Remove any existing handlers to avoid duplicates
         logger.handlers.clear()
 
-        # File handler for server-specific logs
-        file_handler = logging.FileHandler(self.log_file)
+        # File handler for server-specific logs, written by the queue listener
+        file_handler = logging.FileHandler(self.log_file, delay=True)
         file_handler.setLevel(logging.INFO)
 
         # Formatter
@@ -50,9 +114,17 @@ class AppiumServerManager:
         )
         file_handler.setFormatter(formatter)
 
-        logger.addHandler(file_handler)
+        _log_router.register(logger.name, file_handler)
+        _start_log_listener()
+        logger.addHandler(_queue_handler)
         return logger
 
+    def close_log(self) -> None:
+        """Close this server's log file once its pending records are written"""
+        _log_queue.put_nowait(
+            logging.makeLogRecord({"name": self.logger.name, "close_log": True})
+        )
+
     def start(self, timeout: int = 30) -> bool:
         """Start the Appium server"""
         with self._lock:
@@ -113,10 +185,12 @@ class AppiumServerManager:
 
     def _wait_for_server_ready(self, timeout: int) -> bool:
         """Wait for the Appium server to be ready"""
-        start_time = time.time()
-        status_url = f"http://127.0.0.1:{self.port}/status"
+        start_time = time.monotonic()
+        # Back off from a short first interval so a fast startup is seen quickly
+        delay = 0.05
+        status_client = _get_status_client()
 
-        while (time.time() - start_time) < timeout:
+        while (time.monotonic() - start_time) < timeout:
             try:
                 # Check if process is still running
                 if self.process and self.process.poll() is not None:
@@ -124,13 +198,14 @@ class AppiumServerManager:
                     return False
 
                 # Try to connect to the server
-                response = requests.get(status_url, timeout=2)
+                response = status_client.get(self.status_url, timeout=0.5)
                 if response.status_code == 200:
                     return True
-            except requests.RequestException:
+            except httpx.HTTPError:
                 pass  # Server not ready yet
 
-            time.sleep(1)
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.5)
 
         return False
 
@@ -183,16 +258,24 @@ class AppiumServerManager:
             self.is_running = False
             return False
 
+        # Reuse a recent probe so bursts of health checks don't hit the server
+        now = time.monotonic()
+        cached = self._alive_cache
+        if cached and now - cached[0] < self.ALIVE_CACHE_TTL:
+            return cached[1]
+
         # Try to ping the server
         try:
-            response = requests.get(f"http://127.0.0.1:{self.port}/status", timeout=2)
-            return response.status_code == 200
-        except requests.RequestException:
-            return False
+            alive = _get_status_client().get(self.status_url).status_code == 200
+        except httpx.HTTPError:
+            alive = False
+
+        self._alive_cache = (now, alive)
+        return alive
 
     def get_service_url(self) -> str:
         """Get the service URL for this Appium server"""
-        return f"http://127.0.0.1:{self.port}"
+        return self.service_url
 
     def get_info(self) -> Dict[str, Any]:
         """Get information about this server instance"""
@@ -200,7 +283,7 @@ class AppiumServerManager:
             "session_id": self.session_id,
             "port": self.port,
             "is_running": self.is_running,
-            "service_url": self.get_service_url(),
+            "service_url": self.service_url,
             "log_file": self.log_file,
             "is_alive": self.is_alive(),
         }
@@ -2,30 +2,69 @@
 Session Pool - Manages multiple Appium server instances and session allocation
 """
 
-import uuid
+import os
 import time
+import queue
+import heapq
+import secrets
 import logging
+import itertools
 import threading
-from typing import Dict, Optional, List, Set
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
+from dataclasses import dataclass, field
 from .server_manager import AppiumServerManager
 
+# Session IDs are a per-process random prefix plus a counter
+_session_prefix = secrets.token_hex(8)
+_session_counter = itertools.count()
 
-@dataclass
+# Runs is_alive() probes for all sessions concurrently
+_probe_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="sp-probe")
+
+
+@dataclass(slots=True)
 class SessionInfo:
-    """Information about an active session"""
+    """Information about an active session
+
+    created_at and last_used are time.monotonic() values; created_at_wall is
+    the wall-clock creation time reported to clients.
+    """
 
     session_id: str
     server_manager: AppiumServerManager
     created_at: float
     last_used: float
+    created_at_wall: float
     device_udid: Optional[str] = None
     device_name: Optional[str] = None
+    service_url: str = ""
+    # Last proxied raw request headers and their forwarded form
+    header_cache: Optional[Tuple[list, list]] = field(default=None, repr=False)
+
+    @property
+    def last_used_wall(self) -> float:
+        """Wall-clock time of the last use"""
+        return self.created_at_wall + (self.last_used - self.created_at)
+
+
+def _probe_alive(sessions: List[Tuple[str, SessionInfo]]) -> List[bool]:
+    """Run is_alive() for the given sessions concurrently"""
+    return list(
+        _probe_pool.map(lambda item: item[1].server_manager.is_alive(), sessions)
+    )
 
 
 class SessionPool:
     """Manages a pool of Appium server instances for parallel testing"""
 
+    # How long (seconds) a health_check() result is served from cache
+    HEALTH_CACHE_TTL = 1.5
+
+    # last_used is only refreshed once it is older than this many seconds,
+    # or half the session timeout if that is shorter
+    LAST_USED_RESOLUTION = 5.0
+
     def __init__(
         self,
         port_range_start: int = 4723,
@@ -39,198 +78,286 @@ class SessionPool:
         self.max_sessions = max_sessions
         self.session_timeout = session_timeout
         self.log_dir = log_dir
-
-        # Thread-safe data structures
-        self._lock = threading.RLock()
+        # Coarse enough to skip most writes, fine enough that a session in
+        # use never looks idle for a whole timeout
+        self._touch_resolution = min(self.LAST_USED_RESOLUTION, session_timeout / 2)
+
+        # Thread-safe data structures. _lock only guards session mutations;
+        # lookups read the dict directly, which is atomic under the GIL. No
+        # method takes it while already holding it, so it need not be reentrant.
+        self._lock = threading.Lock()
         self._sessions: Dict[str, SessionInfo] = {}
-        self._used_ports: Set[int] = set()
-        self._available_ports = list(range(port_range_start, port_range_end + 1))
+        # Sessions whose server is still starting, outside the lock
+        self._pending = 0
+        # Free ports, handed out and returned without taking the pool lock. FIFO
+        # order also keeps a just-released port out of use for as long as possible.
+        self._free_ports: queue.SimpleQueue = queue.SimpleQueue()
+        for port in range(port_range_start, port_range_end + 1):
+            self._free_ports.put(port)
+        self._health_cache: Tuple[float, Dict] = (0.0, {})
+
+        # (deadline, session_id) entries for the cleanup thread; an entry may be
+        # stale if the session was used since it was pushed
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expiry_cv = threading.Condition(self._lock)
+
+        # Bound how many Appium (Node) servers boot at once to avoid CPU thrashing;
+        # count only the CPUs this process may actually run on
+        self._start_sem = threading.BoundedSemaphore(
+            min(max_sessions, os.process_cpu_count() or 4)
+        )
 
         # Setup logging
         self.logger = logging.getLogger(__name__)
 
         # Start cleanup thread
         self._cleanup_thread = threading.Thread(
-            target=self._cleanup_expired_sessions, daemon=True
+            target=self._cleanup_expired_sessions,
+            name="session-pool-cleanup",
+            daemon=True,
         )
         self._cleanup_thread.start()
 
     def _get_next_available_port(self) -> Optional[int]:
-        """Get the next available port from the range"""
-        for port in self._available_ports:
-            if port not in self._used_ports:
-                return port
-        return None
+        """Take the next free port from the range"""
+        try:
+            return self._free_ports.get_nowait()
+        except queue.Empty:
+            return None
 
     def create_session(
         self, device_udid: Optional[str] = None, device_name: Optional[str] = None
     ) -> Optional[str]:
         """Create a new session and start an Appium server"""
         with self._lock:
-            if len(self._sessions) >= self.max_sessions:
+            # Sessions still starting count against the limit too
+            if len(self._sessions) + self._pending >= self.max_sessions:
                 self.logger.warning(f"Maximum sessions ({self.max_sessions}) reached")
                 return None
 
-            # Get next available port
+            # Reserve the next available port
             port = self._get_next_available_port()
             if port is None:
                 self.logger.error("No available ports in the specified range")
                 return None
 
-            # Generate session ID
-            session_id = str(uuid.uuid4())
+            self._pending += 1
 
-            try:
-                # Create and start server manager
-                server_manager = AppiumServerManager(
-                    port=port, session_id=session_id, log_dir=self.log_dir
-                )
+        # Generate session ID
+        session_id = f"{_session_prefix}-{next(_session_counter):x}"
+        session_info = None
 
-                if not server_manager.start():
-                    self.logger.error(
-                        f"Failed to start server for session {session_id}"
-                    )
-                    return None
+        # Boot the server without the lock so other sessions can be created,
+        # used and deleted meanwhile
+        try:
+            # Create and start server manager
+            server_manager = AppiumServerManager(
+                port=port, session_id=session_id, log_dir=self.log_dir
+            )
 
-                # Mark port as used
-                self._used_ports.add(port)
+            with self._start_sem:
+                started = server_manager.start()
 
+            if started:
                 # Create session info
+                now = time.monotonic()
                 session_info = SessionInfo(
                     session_id=session_id,
                     server_manager=server_manager,
-                    created_at=time.time(),
-                    last_used=time.time(),
+                    created_at=now,
+                    last_used=now,
+                    created_at_wall=time.time(),
                     device_udid=device_udid,
                     device_name=device_name,
+                    service_url=server_manager.get_service_url(),
                 )
+            else:
+                self.logger.error(f"Failed to start server for session {session_id}")
+                server_manager.close_log()
 
-                self._sessions[session_id] = session_info
-
-                self.logger.info(f"Created session {session_id} on port {port}")
-                return session_id
+        except Exception as e:
+            self.logger.error(f"Error creating session: {str(e)}")
 
-            except Exception as e:
-                self.logger.error(f"Error creating session: {str(e)}")
-                if port in self._used_ports:
-                    self._used_ports.remove(port)
+        with self._lock:
+            self._pending -= 1
+            if session_info is None:
+                self._free_ports.put(port)
                 return None
 
+            self._sessions[session_id] = session_info
+            self._health_cache = (0.0, {})
+            heapq.heappush(
+                self._expiry_heap,
+                (session_info.last_used + self.session_timeout, session_id),
+            )
+            self._expiry_cv.notify()
+
+        self.logger.info(f"Created session {session_id} on port {port}")
+        return session_id
+
     def get_session(self, session_id: str) -> Optional[SessionInfo]:
-        """Get session information"""
-        with self._lock:
-            session = self._sessions.get(session_id)
-            if session:
-                session.last_used = time.time()
-            return session
+        """Get session information and mark the session as used
+
+        Use this on paths that represent client activity, such as proxied
+        WebDriver commands, so the session does not expire while in use.
+        """
+        session = self._sessions.get(session_id)
+        if session:
+            # A coarse timestamp is enough for expiry and saves a write per call
+            now = time.monotonic()
+            if now - session.last_used > self._touch_resolution:
+                session.last_used = now
+        return session
 
     def get_session_url(self, session_id: str) -> Optional[str]:
         """Get the Appium server URL for a session"""
         session = self.get_session(session_id)
-        if session:
-            return session.server_manager.get_service_url()
-        return None
+        return session.service_url if session else None
+
+    def peek_session(self, session_id: str) -> Optional[SessionInfo]:
+        """Get session information without marking the session as used"""
+        return self._sessions.get(session_id)
+
+    def peek_session_url(self, session_id: str) -> Optional[str]:
+        """Get the Appium server URL for a session without marking it as used"""
+        session = self._sessions.get(session_id)
+        return session.service_url if session else None
 
     def delete_session(self, session_id: str) -> bool:
         """Delete a session and stop its Appium server"""
         with self._lock:
-            session = self._sessions.get(session_id)
+            session = self._sessions.pop(session_id, None)
             if not session:
                 self.logger.warning(f"Session {session_id} not found")
                 return False
-
-            try:
-                # Stop the server
-                session.server_manager.stop()
-
-                # Free the port
-                port = session.server_manager.port
-                if port in self._used_ports:
-                    self._used_ports.remove(port)
-
-                # Remove session
-                del self._sessions[session_id]
-
-                self.logger.info(f"Deleted session {session_id}")
-                return True
-
-            except Exception as e:
-                self.logger.error(f"Error deleting session {session_id}: {str(e)}")
-                return False
+            self._health_cache = (0.0, {})
+
+        # The session is no longer reachable, so stop its server without
+        # holding up other callers while the subprocess exits
+        server_manager = session.server_manager
+        try:
+            stopped = server_manager.stop()
+            server_manager.close_log()
+        except Exception as e:
+            self.logger.error(f"Error deleting session {session_id}: {str(e)}")
+            stopped = False
+
+        # Only reuse the port once the old server has let go of it
+        if stopped:
+            self._free_ports.put(server_manager.port)
+            self.logger.info(f"Deleted session {session_id}")
+        else:
+            self.logger.error(
+                f"Server for session {session_id} did not stop; "
+                f"port {server_manager.port} will not be reused"
+            )
+        return True
 
     def list_sessions(self) -> List[Dict]:
         """List all active sessions"""
+        # Snapshot under the lock; probing servers must not block other callers
         with self._lock:
-            sessions = []
-            for session_id, session_info in self._sessions.items():
-                sessions.append(
-                    {
-                        "session_id": session_id,
-                        "port": session_info.server_manager.port,
-                        "service_url": session_info.server_manager.get_service_url(),
-                        "created_at": session_info.created_at,
-                        "last_used": session_info.last_used,
-                        "device_udid": session_info.device_udid,
-                        "device_name": session_info.device_name,
-                        "is_alive": session_info.server_manager.is_alive(),
-                        "log_file": session_info.server_manager.log_file,
-                    }
-                )
-            return sessions
+            snapshot = list(self._sessions.items())
+
+        return [
+            {
+                "session_id": session_id,
+                "port": session_info.server_manager.port,
+                "service_url": session_info.service_url,
+                "created_at": session_info.created_at_wall,
+                "last_used": session_info.last_used_wall,
+                "device_udid": session_info.device_udid,
+                "device_name": session_info.device_name,
+                "is_alive": is_alive,
+                "log_file": session_info.server_manager.log_file,
+            }
+            for (session_id, session_info), is_alive in zip(
+                snapshot, _probe_alive(snapshot)
+            )
+        ]
 
     def get_session_count(self) -> int:
         """Get the number of active sessions"""
-        with self._lock:
-            return len(self._sessions)
+        return len(self._sessions)
 
     def shutdown_all(self) -> None:
         """Shutdown all sessions"""
+        self.logger.info("Shutting down all sessions...")
         with self._lock:
-            self.logger.info("Shutting down all sessions...")
             session_ids = list(self._sessions.keys())
-            for session_id in session_ids:
-                self.delete_session(session_id)
-            self.logger.info("All sessions shut down")
+
+        if session_ids:
+            # Stop servers concurrently; each stop waits on its own subprocess
+            with ThreadPoolExecutor(
+                max_workers=min(16, len(session_ids)),
+                thread_name_prefix="sp-shutdown",
+            ) as executor:
+                list(executor.map(self.delete_session, session_ids))
+
+        self.logger.info("All sessions shut down")
 
     def _cleanup_expired_sessions(self) -> None:
         """Background thread to cleanup expired sessions"""
         while True:
             try:
-                time.sleep(60)  # Check every minute
-                current_time = time.time()
-
-                with self._lock:
-                    expired_sessions = []
-                    for session_id, session_info in self._sessions.items():
-                        if current_time - session_info.last_used > self.session_timeout:
-                            expired_sessions.append(session_id)
-
-                    for session_id in expired_sessions:
-                        self.logger.info(f"Cleaning up expired session {session_id}")
-                        self.delete_session(session_id)
+                for session_id in self._wait_for_expired_sessions():
+                    self.logger.info(f"Cleaning up expired session {session_id}")
+                    self.delete_session(session_id)
 
             except Exception as e:
                 self.logger.error(f"Error in cleanup thread: {str(e)}")
 
+    def _wait_for_expired_sessions(self) -> List[str]:
+        """Sleep until the earliest session deadline passes and return expired IDs"""
+        with self._expiry_cv:
+            while True:
+                now = time.monotonic()
+                expired = []
+                while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                    _, session_id = heapq.heappop(self._expiry_heap)
+                    session = self._sessions.get(session_id)
+                    if not session:
+                        continue  # Already deleted
+
+                    # Sessions used since their entry was pushed get a new deadline
+                    deadline = session.last_used + self.session_timeout
+                    if deadline <= now:
+                        expired.append(session_id)
+                    else:
+                        heapq.heappush(self._expiry_heap, (deadline, session_id))
+
+                if expired:
+                    return expired
+
+                timeout = self._expiry_heap[0][0] - now if self._expiry_heap else None
+                self._expiry_cv.wait(timeout)
+
     def health_check(self) -> Dict:
         """Perform health check on all sessions"""
+        # Serve a recent result so frequent polling doesn't probe every server
+        checked_at, health = self._health_cache
+        if time.monotonic() - checked_at < self.HEALTH_CACHE_TTL:
+            return health
+
         with self._lock:
-            healthy_sessions = 0
-            unhealthy_sessions = []
-
-            for session_id, session_info in self._sessions.items():
-                if session_info.server_manager.is_alive():
-                    healthy_sessions += 1
-                else:
-                    unhealthy_sessions.append(session_id)
-
-            return {
-                "total_sessions": len(self._sessions),
-                "healthy_sessions": healthy_sessions,
-                "unhealthy_sessions": unhealthy_sessions,
-                "available_ports": len(self._available_ports) - len(self._used_ports),
-                "used_ports": list(self._used_ports),
-            }
+            sessions = list(self._sessions.items())
+        available_ports = self._free_ports.qsize()
+
+        unhealthy_sessions = [
+            session_id
+            for (session_id, _), is_alive in zip(sessions, _probe_alive(sessions))
+            if not is_alive
+        ]
+
+        health = {
+            "total_sessions": len(sessions),
+            "healthy_sessions": len(sessions) - len(unhealthy_sessions),
+            "unhealthy_sessions": unhealthy_sessions,
+            "available_ports": available_ports,
+            "used_ports": [info.server_manager.port for _, info in sessions],
+        }
+        self._health_cache = (time.monotonic(), health)
+        return health
 
     def __enter__(self):
         """Context manager entry"""
@@ -4,6 +4,7 @@ Pytest configuration for parallel Appium testing
 
 import pytest
 import os
+import httpx
 
 
 def pytest_addoption(parser):
@@ -40,6 +41,16 @@ def hub_base_url():
     return os.getenv("HUB_URL", "http://localhost:4444")
 
 
+@pytest.fixture(scope="session")
+def http_client():
+    """HTTP client shared by all tests in this worker, so connections are reused"""
+    with httpx.Client(
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    ) as client:
+        yield client
+
+
 @pytest.fixture(scope="session")
 def test_timeout():
     """Default timeout for tests"""
@@ -3,11 +3,19 @@ Example test using pytest-xdist for parallel testing with Appium Hub
 """
 
 import pytest
-import httpx
 import time
+from types import MappingProxyType
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from appium.options.ios import XCUITestOptions
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def wait_ready(driver, timeout=10):
+    """Wait until the app reports a foreground activity"""
+    WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+        lambda d: d.current_activity is not None
+    )
 
 
 class TestParallelAppium:
@@ -18,54 +26,57 @@ class TestParallelAppium:
         """Hub URL fixture"""
         return "http://localhost:4444"
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def android_capabilities(self):
         """Android test capabilities"""
-        return {
-            "platformName": "Android",
-            "automationName": "UiAutomator2",
-            "deviceName": "Android Device",
-            "app": "/path/to/your/app.apk",  # Update with your app path
-            "noReset": True,
-            "newCommandTimeout": 300,
-        }
+        return MappingProxyType(
+            {
+                "platformName": "Android",
+                "automationName": "UiAutomator2",
+                "deviceName": "Android Device",
+                "app": "/path/to/your/app.apk",  # Update with your app path
+                "noReset": True,
+                "newCommandTimeout": 300,
+            }
+        )
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def ios_capabilities(self):
         """iOS test capabilities"""
-        return {
-            "platformName": "iOS",
-            "automationName": "XCUITest",
-            "deviceName": "iPhone",
-            "app": "/path/to/your/app.ipa",  # Update with your app path
-            "noReset": True,
-            "newCommandTimeout": 300,
-        }
+        return MappingProxyType(
+            {
+                "platformName": "iOS",
+                "automationName": "XCUITest",
+                "deviceName": "iPhone",
+                "app": "/path/to/your/app.ipa",  # Update with your app path
+                "noReset": True,
+                "newCommandTimeout": 300,
+            }
+        )
 
     @pytest.fixture
-    def driver_session(self, hub_url, android_capabilities):
+    def driver_session(self, hub_url, android_capabilities, http_client):
         """Create an Appium driver session through the hub"""
         # Create session through hub
-        with httpx.Client() as client:
-            response = client.post(
-                f"{hub_url}/session",
-                json={
-                    "capabilities": android_capabilities,
-                    "device_name": f"device_{pytest.current_pytest_worker_id}",
-                },
-                timeout=60.0,
-            )
+        response = http_client.post(
+            f"{hub_url}/session",
+            json={
+                "capabilities": dict(android_capabilities),
+                "device_name": f"device_{pytest.current_pytest_worker_id}",
+            },
+            timeout=60.0,
+        )
 
-            if response.status_code != 200:
-                pytest.fail(f"Failed to create session: {response.text}")
+        if response.status_code != 200:
+            pytest.fail(f"Failed to create session: {response.text}")
 
-            session_data = response.json()
-            hub_session_id = session_data["hub_session_id"]
-            service_url = session_data["service_url"]
-            appium_session = session_data["appium_session"]
+        session_data = response.json()
+        hub_session_id = session_data["hub_session_id"]
+        service_url = session_data["service_url"]
+        appium_session = session_data["appium_session"]
 
-            # Extract the actual Appium session ID
-            appium_session_id = appium_session["value"]["sessionId"]
+        # Extract the actual Appium session ID
+        appium_session_id = appium_session["value"]["sessionId"]
 
         # Create Appium driver with the service URL
         options = UiAutomator2Options()
@@ -87,8 +98,7 @@ class TestParallelAppium:
 
         # Delete session from hub
         try:
-            with httpx.Client() as client:
-                client.delete(f"{hub_url}/session/{hub_session_id}", timeout=30.0)
+            http_client.delete(f"{hub_url}/session/{hub_session_id}", timeout=30.0)
         except:
             pass
 
@@ -97,7 +107,7 @@ class TestParallelAppium:
         driver = driver_session
 
         # Wait for app to load
-        time.sleep(3)
+        wait_ready(driver)
 
         # Get current activity (Android specific)
         current_activity = driver.current_activity
@@ -114,7 +124,7 @@ class TestParallelAppium:
         driver = driver_session
 
         # Wait for app to load
-        time.sleep(3)
+        wait_ready(driver)
 
         # Example: Find an element and interact with it
         # Note: Update selectors based on your actual app
@@ -138,7 +148,7 @@ class TestParallelAppium:
         driver = driver_session
 
         # Wait for app to load
-        time.sleep(3)
+        wait_ready(driver)
 
         # Get initial context
         initial_activity = driver.current_activity
@@ -168,27 +178,25 @@ class TestHubManagement:
     def hub_url(self):
         return "http://localhost:4444"
 
-    def test_hub_health(self, hub_url):
+    def test_hub_health(self, hub_url, http_client):
         """Test hub health endpoint"""
-        with httpx.Client() as client:
-            response = client.get(f"{hub_url}/health", timeout=10.0)
-            assert response.status_code == 200
+        response = http_client.get(f"{hub_url}/health", timeout=10.0)
+        assert response.status_code == 200
 
-            health_data = response.json()
-            assert "total_sessions" in health_data
-            assert "healthy_sessions" in health_data
+        health_data = response.json()
+        assert "total_sessions" in health_data
+        assert "healthy_sessions" in health_data
 
-    def test_list_sessions(self, hub_url):
+    def test_list_sessions(self, hub_url, http_client):
         """Test listing sessions"""
-        with httpx.Client() as client:
-            response = client.get(f"{hub_url}/sessions", timeout=10.0)
-            assert response.status_code == 200
+        response = http_client.get(f"{hub_url}/sessions", timeout=10.0)
+        assert response.status_code == 200
 
-            sessions_data = response.json()
-            assert "sessions" in sessions_data
-            assert isinstance(sessions_data["sessions"], list)
+        sessions_data = response.json()
+        assert "sessions" in sessions_data
+        assert isinstance(sessions_data["sessions"], list)
 
-    def test_create_and_delete_session(self, hub_url):
+    def test_create_and_delete_session(self, hub_url, http_client):
         """Test creating and deleting a session"""
         capabilities = {
             "platformName": "Android",
@@ -197,24 +205,23 @@ class TestHubManagement:
             "app": "/path/to/test/app.apk",
         }
 
-        with httpx.Client() as client:
-            # Create session
-            response = client.post(
-                f"{hub_url}/session", json={"capabilities": capabilities}, timeout=60.0
-            )
+        # Create session
+        response = http_client.post(
+            f"{hub_url}/session", json={"capabilities": capabilities}, timeout=60.0
+        )
 
-            if response.status_code == 200:
-                session_data = response.json()
-                hub_session_id = session_data["hub_session_id"]
-
-                # Delete session
-                delete_response = client.delete(
-                    f"{hub_url}/session/{hub_session_id}", timeout=30.0
-                )
-                assert delete_response.status_code == 200
-            else:
-                # If session creation fails (e.g., no device available), that's OK for this test
-                assert response.status_code in [503, 500]
+        if response.status_code == 200:
+            session_data = response.json()
+            hub_session_id = session_data["hub_session_id"]
+
+            # Delete session
+            delete_response = http_client.delete(
+                f"{hub_url}/session/{hub_session_id}", timeout=30.0
+            )
+            assert delete_response.status_code == 200
+        else:
+            # If session creation fails (e.g., no device available), that's OK for this test
+            assert response.status_code in [503, 500]
 
 
 # Configuration for pytest-xdist
@@ -3,8 +3,8 @@ Simple example test demonstrating basic hub usage
 """
 
 import pytest
-import httpx
 import time
+from types import MappingProxyType
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 
@@ -21,7 +21,7 @@ def udid(request):
     return request.config.getoption("--udid")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def basic_android_caps(udid):
     """Basic Android capabilities for testing"""
     caps = {
@@ -35,51 +35,52 @@ def basic_android_caps(udid):
         "appium:newCommandTimeout": 300,
     }
     # opts = UiAutomator2Options()
-    return caps  # opts.load_capabilities(caps)
+    return MappingProxyType(caps)  # opts.load_capabilities(caps)
 
 
 class TestBasicHub:
     """Basic hub functionality tests"""
 
-    def test_hub_status(self, hub_url):
+    def test_hub_status(self, hub_url, http_client):
         """Test that hub is responding"""
-        with httpx.Client() as client:
-            response = client.get(hub_url, timeout=10.0)
-            assert response.status_code == 200
+        response = http_client.get(hub_url, timeout=10.0)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["name"] == "Appium Gateway Hub"
-            assert data["status"] == "running"
+        data = response.json()
+        assert data["name"] == "Appium Gateway Hub"
+        assert data["status"] == "running"
 
-    def test_create_session_manual(self, hub_url, basic_android_caps):
+    def test_create_session_manual(self, hub_url, basic_android_caps, http_client):
         """Test creating a session manually through the hub API"""
-        with httpx.Client(timeout=60.0) as client:
-            # Create session
-            response = client.post(
-                f"{hub_url}/session",
-                json={"capabilities": basic_android_caps, "device_name": "test_device"},
-            )
-
-            # Check if we can create a session (might fail if no device available)
-            if response.status_code == 200:
-                session_data = response.json()
-                hub_session_id = session_data["hub_session_id"]
-
-                # Get session info
-                info_response = client.get(f"{hub_url}/session/{hub_session_id}/info")
-                assert info_response.status_code == 200
-
-                info_data = info_response.json()
-                assert info_data["session_id"] == hub_session_id
-                assert info_data["is_alive"] is True
-
-                # Clean up
-                delete_response = client.delete(f"{hub_url}/session/{hub_session_id}")
-                assert delete_response.status_code == 200
-            else:
-                # Session creation failed - might be no devices available
-                print(f"Session creation failed: {response.text}")
-                assert response.status_code in [503, 500]
+        # Create session
+        response = http_client.post(
+            f"{hub_url}/session",
+            json={
+                "capabilities": dict(basic_android_caps),
+                "device_name": "test_device",
+            },
+        )
+
+        # Check if we can create a session (might fail if no device available)
+        if response.status_code == 200:
+            session_data = response.json()
+            hub_session_id = session_data["hub_session_id"]
+
+            # Get session info
+            info_response = http_client.get(f"{hub_url}/session/{hub_session_id}/info")
+            assert info_response.status_code == 200
+
+            info_data = info_response.json()
+            assert info_data["session_id"] == hub_session_id
+            assert info_data["is_alive"] is True
+
+            # Clean up
+            delete_response = http_client.delete(f"{hub_url}/session/{hub_session_id}")
+            assert delete_response.status_code == 200
+        else:
+            # Session creation failed - might be no devices available
+            print(f"Session creation failed: {response.text}")
+            assert response.status_code in [503, 500]
 
 
 # Example of running tests in parallel:
@@ -6,24 +6,66 @@ Simple test script to verify the Appium Hub setup
 import sys
 import os
 import time
+import shutil
 import subprocess
-import requests
 
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
+# Caches the output of `appium --version`, keyed by the binary's path and mtime
+APPIUM_VERSION_CACHE = os.path.join(
+    os.path.expanduser("~"), ".cache", "parallel-appium", "appium-version"
+)
+
+
+def _read_cached_appium_version(appium_path, mtime):
+    """Return the cached Appium version if the binary hasn't changed"""
+    try:
+        with open(APPIUM_VERSION_CACHE, encoding="utf-8") as f:
+            cached_path, cached_mtime, version = f.read().split("\n", 2)
+    except (OSError, ValueError):
+        return None
+
+    if cached_path != appium_path or cached_mtime != str(mtime):
+        return None
+    return version.strip() or None
+
+
+def _write_cached_appium_version(appium_path, mtime, version):
+    """Remember the Appium version for the current binary"""
+    try:
+        os.makedirs(os.path.dirname(APPIUM_VERSION_CACHE), exist_ok=True)
+        with open(APPIUM_VERSION_CACHE, "w", encoding="utf-8") as f:
+            f.write(f"{appium_path}\n{mtime}\n{version}\n")
+    except OSError:
+        pass  # The cache is only an optimization
+
 
 def check_appium_installed():
     """Check if Appium is installed and accessible"""
     try:
+        appium_path = shutil.which("appium")
+        if appium_path is None:
+            raise FileNotFoundError("appium")
+
+        # Skip starting Node when the binary is unchanged since the last check
+        mtime = os.stat(appium_path).st_mtime_ns
+        version = _read_cached_appium_version(appium_path, mtime)
+        if version:
+            print(f"✅ Appium is installed: {version}")
+            return True
+
         result = subprocess.run(
-            ["appium", "--version"], capture_output=True, text=True, timeout=10
+            [appium_path, "--version"], capture_output=True, timeout=10
         )
         if result.returncode == 0:
-            print(f"✅ Appium is installed: {result.stdout.strip()}")
+            version = result.stdout.strip().decode("ascii", "replace")
+            _write_cached_appium_version(appium_path, mtime, version)
+            print(f"✅ Appium is installed: {version}")
             return True
         else:
-            print(f"❌ Appium version check failed: {result.stderr}")
+            stderr = result.stderr.decode("utf-8", "replace")
+            print(f"❌ Appium version check failed: {stderr}")
             return False
     except subprocess.TimeoutExpired:
         print("❌ Appium version check timed out")